@@ -15,12 +15,17 @@ Usage (recommended):
 
 from __future__ import annotations
 
-import json
 import os
-from typing import Any, Dict, Callable
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Callable, List, NamedTuple, Optional, Tuple
 
+import orjson
 from huggingface_hub import InferenceClient
 
+from map_servers.composite import poi_with_routes_impl
 from map_servers.osm_server import (
     osm_geocode_impl,
     osm_reverse_geocode_impl,
@@ -55,21 +60,81 @@ MODEL_ID = "meta-llama/Meta-Llama-3-8B-Instruct"
 client = InferenceClient(api_key=HF_TOKEN)
 
 
-def _hf_chat(messages: list[Dict[str, str]], max_tokens: int = 512) -> str:
+def _json_dumps(obj: Any) -> str:
+    """orjson-based drop-in for json.dumps(obj, indent=2) on the hot path."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+
+def _hf_chat(
+    messages: list[Dict[str, str]],
+    max_tokens: int = 512,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> str:
     """
     Call Hugging Face chat completion API and return the assistant text.
 
     messages: list of {"role": "system"|"user"|"assistant", "content": str}
+    response_format: optional grammar/JSON-schema constraint on the output.
     """
-    completion = client.chat.completions.create(
-        model=MODEL_ID,
-        messages=messages,
-        max_tokens=max_tokens,
-    )
+    kwargs: Dict[str, Any] = {
+        "model": MODEL_ID,
+        "messages": messages,
+        "max_tokens": max_tokens,
+    }
+    if response_format is not None:
+        kwargs["response_format"] = response_format
+    completion = client.chat.completions.create(**kwargs)
     # OpenAI-style output: choices[0].message.content
     return completion.choices[0].message.content
 
 
+def _hf_chat_stream(
+    messages: list[Dict[str, str]],
+    max_tokens: int = 512,
+    response_format: Optional[Dict[str, Any]] = None,
+):
+    """
+    Streaming variant of _hf_chat: yields assistant text chunks as they
+    arrive, so the UI can render tokens long before the completion ends.
+    """
+    kwargs: Dict[str, Any] = {
+        "model": MODEL_ID,
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+    if response_format is not None:
+        kwargs["response_format"] = response_format
+    stream = client.chat.completions.create(**kwargs)
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
+
+# Pool for overlapping several chat completions. HF Inference exposes no
+# batch endpoint for chat, so concurrent requests over the shared client
+# are the closest thing to dynamic batching: the provider coalesces them
+# server-side and they complete in max(latency) instead of sum(latency).
+_LLM_EXECUTOR = ThreadPoolExecutor(max_workers=16)
+
+
+def _hf_chat_many(messages_list: List[List[Dict[str, str]]], max_tokens: int = 512) -> List[str]:
+    """
+    Issue several independent chat completions concurrently.
+
+    Returns the assistant texts in the same order as messages_list.
+    """
+    if len(messages_list) == 1:
+        return [_hf_chat(messages_list[0], max_tokens=max_tokens)]
+
+    futures = [
+        _LLM_EXECUTOR.submit(_hf_chat, messages, max_tokens)
+        for messages in messages_list
+    ]
+    return [future.result() for future in futures]
+
+
 # ----------------------------------------------------------------------
 # 2. Tool registry: names -> description + Python callables
 # ----------------------------------------------------------------------
@@ -132,6 +197,20 @@ def _tool_schema() -> Dict[str, Dict[str, Any]]:
                 "profile": "string (optional, default='driving') - OSRM profile (driving, bike, foot).",
             },
         },
+        "poi_with_routes": {
+            "description": (
+                "Search POIs around a coordinate and get a driving route from that "
+                "coordinate to each match in one call (Overpass + OSRM)."
+            ),
+            "args": {
+                "lat": "float (required) - center latitude.",
+                "lon": "float (required) - center longitude.",
+                "radius_m": "integer (optional, default=500) - radius in meters (50-5000).",
+                "key": "string (optional, default='amenity') - OSM tag key.",
+                "value": "string (optional, default='restaurant') - OSM tag value.",
+                "limit": "integer (optional, default=10) - max POIs to route to (1-20).",
+            },
+        },
     }
 
 
@@ -142,28 +221,390 @@ TOOL_FUNCTIONS: Dict[str, Callable[..., Any]] = {
     "osrm_route_driving": osrm_route_driving_impl,
     "osrm_route_cycling": osrm_route_cycling_impl,
     "osrm_nearest_road": osrm_nearest_road_impl,
+    "poi_with_routes": poi_with_routes_impl,
+}
+
+# The tool schema never changes at runtime, so build it once at import
+# time instead of on every user turn.
+_TOOL_SCHEMA: Dict[str, Dict[str, Any]] = _tool_schema()
+
+# Compact one-line signatures for the system prompt. The pretty-printed
+# JSON arg specs roughly tripled the prompt in bytes and LLM input
+# tokens, which are re-processed and re-billed on every single turn;
+# types and defaults carry the same information in far fewer tokens.
+_TOOL_SIGNATURES: Dict[str, str] = {
+    "osm_geocode": "osm_geocode(query: str, limit: int = 5)",
+    "osm_reverse_geocode": "osm_reverse_geocode(lat: float, lon: float, zoom: int = 18)",
+    "osm_search_poi": (
+        "osm_search_poi(lat: float, lon: float, radius_m: int = 500, "
+        "key: str = 'amenity', value: str = 'restaurant', limit: int = 20)"
+    ),
+    "osrm_route_driving": (
+        "osrm_route_driving(start_lat: float, start_lon: float, end_lat: float, end_lon: float)"
+    ),
+    "osrm_route_cycling": (
+        "osrm_route_cycling(start_lat: float, start_lon: float, end_lat: float, end_lon: float)"
+    ),
+    "osrm_nearest_road": "osrm_nearest_road(lat: float, lon: float, profile: str = 'driving')",
+    "poi_with_routes": (
+        "poi_with_routes(lat: float, lon: float, radius_m: int = 500, "
+        "key: str = 'amenity', value: str = 'restaurant', limit: int = 10)"
+    ),
 }
 
+_TOOLS_TEXT: str = "\n".join(
+    f"- {_TOOL_SIGNATURES[name]}: {spec['description']}"
+    for name, spec in _TOOL_SCHEMA.items()
+)
+
+# JSON-schema argument specs per tool, used to constrain the decision
+# reply via response_format so the model cannot emit prose, markdown
+# fences, or malformed JSON around its tool choice.
+_TOOL_ARG_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "osm_geocode": {
+        "type": "object",
+        "properties": {"query": {"type": "string"}, "limit": {"type": "integer"}},
+        "required": ["query"],
+        "additionalProperties": False,
+    },
+    "osm_reverse_geocode": {
+        "type": "object",
+        "properties": {
+            "lat": {"type": "number"},
+            "lon": {"type": "number"},
+            "zoom": {"type": "integer"},
+        },
+        "required": ["lat", "lon"],
+        "additionalProperties": False,
+    },
+    "osm_search_poi": {
+        "type": "object",
+        "properties": {
+            "lat": {"type": "number"},
+            "lon": {"type": "number"},
+            "radius_m": {"type": "integer"},
+            "key": {"type": "string"},
+            "value": {"type": "string"},
+            "limit": {"type": "integer"},
+        },
+        "required": ["lat", "lon"],
+        "additionalProperties": False,
+    },
+    "osrm_route_driving": {
+        "type": "object",
+        "properties": {
+            "start_lat": {"type": "number"},
+            "start_lon": {"type": "number"},
+            "end_lat": {"type": "number"},
+            "end_lon": {"type": "number"},
+        },
+        "required": ["start_lat", "start_lon", "end_lat", "end_lon"],
+        "additionalProperties": False,
+    },
+    "osrm_route_cycling": {
+        "type": "object",
+        "properties": {
+            "start_lat": {"type": "number"},
+            "start_lon": {"type": "number"},
+            "end_lat": {"type": "number"},
+            "end_lon": {"type": "number"},
+        },
+        "required": ["start_lat", "start_lon", "end_lat", "end_lon"],
+        "additionalProperties": False,
+    },
+    "osrm_nearest_road": {
+        "type": "object",
+        "properties": {
+            "lat": {"type": "number"},
+            "lon": {"type": "number"},
+            "profile": {"type": "string"},
+        },
+        "required": ["lat", "lon"],
+        "additionalProperties": False,
+    },
+    "poi_with_routes": {
+        "type": "object",
+        "properties": {
+            "lat": {"type": "number"},
+            "lon": {"type": "number"},
+            "radius_m": {"type": "integer"},
+            "key": {"type": "string"},
+            "value": {"type": "string"},
+            "limit": {"type": "integer"},
+        },
+        "required": ["lat", "lon"],
+        "additionalProperties": False,
+    },
+}
+
+
+def _build_decision_schema() -> Dict[str, Any]:
+    """Schema union: one tool call, a list of tool calls, or a direct answer."""
+    tool_call = {
+        "anyOf": [
+            {
+                "type": "object",
+                "properties": {"tool": {"const": name}, "args": arg_schema},
+                "required": ["tool", "args"],
+                "additionalProperties": False,
+            }
+            for name, arg_schema in _TOOL_ARG_SCHEMAS.items()
+        ]
+    }
+    return {
+        "oneOf": [
+            tool_call,
+            {
+                "type": "object",
+                "properties": {"tools": {"type": "array", "items": tool_call, "minItems": 1}},
+                "required": ["tools"],
+                "additionalProperties": False,
+            },
+            {
+                "type": "object",
+                "properties": {"answer": {"type": "string"}},
+                "required": ["answer"],
+                "additionalProperties": False,
+            },
+        ]
+    }
+
+
+_DECISION_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "tool_decision",
+        "schema": _build_decision_schema(),
+        "strict": True,
+    },
+}
+
+# Constrained decoding is an optimization, not a requirement: some
+# providers reject the root-level oneOf/const schema above with a client
+# error. On the first failure of a constrained call this flag flips and
+# later decision calls go out unconstrained directly, instead of paying
+# a doomed request per turn. If the failure was transient we only lose
+# the optimization; the JSONDecodeError fallbacks below already handle
+# output that does not match the schema.
+_decision_schema_ok = True
+
 
 # ----------------------------------------------------------------------
-# 3. Agent logic: decide tool vs direct answer, then explain
+# 3. Response caches: repeated queries skip the LLM round-trips
 # ----------------------------------------------------------------------
 
-def build_system_prompt() -> str:
-    tools_desc = _tool_schema()
-    tools_text_parts = []
-    for name, spec in tools_desc.items():
-        tools_text_parts.append(
-            f"- {name}:\n"
-            f"  description: {spec['description']}\n"
-            f"  args: {json.dumps(spec['args'], indent=2)}"
-        )
-    tools_text = "\n".join(tools_text_parts)
+# Both LLM calls per turn are network-bound and dominate latency, and map
+# queries repeat a lot ("route from A to B" re-submitted verbatim), so we
+# cache final answers keyed by the normalized prompt. Deterministic tool
+# calls (OSRM/Overpass) get their own memo so they are reused even when
+# the LLM rephrases the arguments.
+
+# The caches are shared between Gradio request threads and the tool/LLM
+# pools, so every access holds the cache's lock; only the tool call
+# itself runs unlocked.
+_ANSWER_CACHE_MAX = 1024
+_ANSWER_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_ANSWER_CACHE_LOCK = threading.Lock()
+
+_TOOL_RESULT_CACHE_MAX = 1024
+_TOOL_RESULT_CACHE: "OrderedDict[Tuple[str, frozenset], Any]" = OrderedDict()
+_TOOL_RESULT_CACHE_LOCK = threading.Lock()
+
+
+def _normalize_prompt(user_message: str) -> str:
+    return " ".join(user_message.strip().lower().split())
+
+
+def _answer_cache_get(norm: str) -> Optional[str]:
+    """Exact match on the normalized prompt only: token-overlap matching
+    is order-blind, and in routing queries word order is meaning
+    ("from Berlin to Munich" vs "from Munich to Berlin")."""
+    with _ANSWER_CACHE_LOCK:
+        if norm in _ANSWER_CACHE:
+            _ANSWER_CACHE.move_to_end(norm)
+            return _ANSWER_CACHE[norm]
+    return None
+
+
+def _answer_cache_put(norm: str, answer: str) -> None:
+    with _ANSWER_CACHE_LOCK:
+        _ANSWER_CACHE[norm] = answer
+        _ANSWER_CACHE.move_to_end(norm)
+        while len(_ANSWER_CACHE) > _ANSWER_CACHE_MAX:
+            _ANSWER_CACHE.popitem(last=False)
+
+
+def _tool_cache_key(tool_name: str, args: Dict[str, Any]) -> Optional[Tuple[str, frozenset]]:
+    """Hashable key for a tool call, or None if args are not hashable."""
+    try:
+        return (tool_name, frozenset(args.items()))
+    except TypeError:
+        return None
+
+
+def _call_tool_cached(tool_fn: Callable[..., Any], tool_name: str, args: Dict[str, Any]) -> Any:
+    key = _tool_cache_key(tool_name, args)
+    if key is not None:
+        with _TOOL_RESULT_CACHE_LOCK:
+            if key in _TOOL_RESULT_CACHE:
+                _TOOL_RESULT_CACHE.move_to_end(key)
+                return _TOOL_RESULT_CACHE[key]
+
+    result = tool_fn(**args)
+
+    if key is not None:
+        with _TOOL_RESULT_CACHE_LOCK:
+            _TOOL_RESULT_CACHE[key] = result
+            while len(_TOOL_RESULT_CACHE) > _TOOL_RESULT_CACHE_MAX:
+                _TOOL_RESULT_CACHE.popitem(last=False)
+
+    return result
+
+
+# Independent tool calls from one decision are network-bound, so fan them
+# out on a small shared pool: N calls finish in max(latency), not sum.
+_TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+
+# ----------------------------------------------------------------------
+# 3b. Deterministic formatters: skip the LLM for fixed-shape tool results
+# ----------------------------------------------------------------------
+
+# Routing and nearest-road results have a fixed schema, so paraphrasing
+# them with a second LLM call just doubles latency and cost. Free-form
+# results (geocoding, POI lists) still go through the LLM.
+#
+# EXPLAIN_MODE controls the behavior:
+#   auto (default) - format known shapes locally, LLM for the rest
+#   fast           - never call the LLM to explain; unknown shapes get raw JSON
+#   llm            - always explain via the LLM (original behavior)
+_EXPLAIN_MODE = os.environ.get("EXPLAIN_MODE", "auto").strip().lower()
 
+
+def _format_route_result(mode: str, args: Dict[str, Any], result: Dict[str, Any]) -> str:
+    summary = result.get("summary") or ""
+    via = f" via {summary}" if summary else ""
+    return (
+        f"The {mode} route is {result['distance_km']:.2f} km and takes about "
+        f"{result['duration_min']:.1f} minutes{via}."
+    )
+
+
+def _format_nearest_road_result(args: Dict[str, Any], result: Dict[str, Any]) -> str:
+    profile = args.get("profile", "driving")
+    text = (
+        f"The nearest road ({profile} profile) is at "
+        f"({result['snapped_lat']:.6f}, {result['snapped_lon']:.6f})"
+    )
+    distance_m = result.get("distance_m")
+    if distance_m is not None:
+        text += f", about {distance_m:.0f} m from the given point"
+    return text + "."
+
+
+_FORMATTERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], str]] = {
+    "osrm_route_driving": lambda args, result: _format_route_result("driving", args, result),
+    "osrm_route_cycling": lambda args, result: _format_route_result("cycling", args, result),
+    "osrm_nearest_road": _format_nearest_road_result,
+}
+
+
+class _ToolRow(NamedTuple):
+    """Everything the agent needs about one tool, resolved at import."""
+
+    fn: Callable[..., Any]
+    description: str
+    signature: str
+    arg_schema: Dict[str, Any]
+    formatter: Optional[Callable[[Dict[str, Any], Dict[str, Any]], str]]
+
+
+# Flat registry with interned names: the hot path does a single dict hop
+# per tool call instead of separate lookups in the schema, function, and
+# formatter dicts, none of which change after import.
+_TOOL_REGISTRY: Dict[str, _ToolRow] = {
+    sys.intern(name): _ToolRow(
+        fn=TOOL_FUNCTIONS[name],
+        description=spec["description"],
+        signature=_TOOL_SIGNATURES[name],
+        arg_schema=_TOOL_ARG_SCHEMAS[name],
+        formatter=_FORMATTERS.get(name),
+    )
+    for name, spec in _TOOL_SCHEMA.items()
+}
+
+
+def _validate_tool_args(row: _ToolRow, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate and coerce LLM-supplied args against the tool's JSON schema
+    before any network call is made.
+
+    Fails fast on unknown or missing keys and coerces numeric strings
+    like "52.5" to the expected type, instead of letting the tool enter
+    and blow up mid-request. Raises ValueError with a readable message.
+    """
+    properties = row.arg_schema.get("properties", {})
+    required = row.arg_schema.get("required", [])
+
+    missing = [key for key in required if key not in args]
+    if missing:
+        raise ValueError(f"missing required argument(s): {', '.join(missing)}")
+
+    validated: Dict[str, Any] = {}
+    for key, value in args.items():
+        prop = properties.get(key)
+        if prop is None:
+            raise ValueError(f"unexpected argument '{key}'")
+
+        expected = prop.get("type")
+        try:
+            if expected == "number":
+                value = float(value)
+            elif expected == "integer" and not isinstance(value, bool):
+                value = int(value)
+            elif expected == "string" and not isinstance(value, str):
+                raise TypeError
+            elif expected == "boolean" and not isinstance(value, bool):
+                raise TypeError
+        except (TypeError, ValueError):
+            raise ValueError(
+                f"argument '{key}' must be of type {expected}, got {value!r}"
+            ) from None
+
+        validated[key] = value
+
+    return validated
+
+
+def _format_tool_result(row: _ToolRow, args: Dict[str, Any], result: Any) -> Optional[str]:
+    """
+    Deterministic rendering of a tool result, or None if the LLM should
+    explain it instead (unknown shape, or EXPLAIN_MODE=llm).
+    """
+    if _EXPLAIN_MODE == "llm":
+        return None
+
+    if row.formatter is not None:
+        try:
+            return row.formatter(args, result)
+        except (KeyError, TypeError, ValueError):
+            return None  # unexpected shape, let the LLM handle it
+
+    if _EXPLAIN_MODE == "fast":
+        return _json_dumps(result)
+
+    return None
+
+
+# ----------------------------------------------------------------------
+# 4. Agent logic: decide tool vs direct answer, then explain
+# ----------------------------------------------------------------------
+
+def _build_system_prompt() -> str:
     return (
         "You are a geospatial assistant that can call a set of tools (map servers).\n"
         "Tools available:\n"
-        f"{tools_text}\n\n"
+        f"{_TOOLS_TEXT}\n\n"
         "You MUST decide if you need to call a tool.\n"
         "If you need a tool, respond ONLY with a JSON object of the form:\n"
         '{\n'
@@ -171,12 +612,46 @@ def build_system_prompt() -> str:
         '  \"args\": { ... }\n'
         '}\n'
         "where <tool_name> is one of the tools above, and args contains only simple JSON types.\n"
+        "If the request needs several independent tools (e.g. a route AND a nearest-road\n"
+        "lookup), respond ONLY with a JSON object of the form:\n"
+        '{\n'
+        '  \"tools\": [ { \"tool\": \"<tool_name>\", \"args\": { ... } }, ... ]\n'
+        '}\n'
         "If you can answer directly without tools (e.g., conceptual explanation), respond ONLY with:\n"
         '{ \"answer\": \"<your natural language answer>\" }\n'
         "Do not add any extra text outside the JSON. The JSON must be the entire response."
     )
 
 
+# Frozen at import: the prompt is identical for every session and turn.
+_SYSTEM_PROMPT: str = _build_system_prompt()
+
+# Static instructions for the explain step. Keeping everything stable in
+# the system message (and putting only the volatile per-turn blob in the
+# user message, large raw result last) lets providers that cache prompt
+# prefixes reuse the long static part on every turn.
+_EXPLAIN_SYSTEM_PROMPT: str = (
+    "You are a helpful geospatial assistant. A tool has been called on behalf of "
+    "the user; other tools may have been called separately for the same request.\n"
+    "Tools available:\n"
+    f"{_TOOLS_TEXT}\n\n"
+    "The user message, the tool used, its arguments, and the raw JSON result follow. "
+    "Explain the result to the user in clear natural language. "
+    "Summarize key distances, durations, coordinates, and any useful POI details. "
+    "Do not show the raw JSON, just a human-readable explanation."
+)
+
+# Shared message shells: every turn reuses the same system-message dict
+# object (and the already-frozen prompt strings) instead of rebuilding
+# identical dicts per call; only the user slot is constructed per turn.
+_DECIDE_SYSTEM_MESSAGE: Dict[str, str] = {"role": "system", "content": _SYSTEM_PROMPT}
+_EXPLAIN_SYSTEM_MESSAGE: Dict[str, str] = {"role": "system", "content": _EXPLAIN_SYSTEM_PROMPT}
+
+
+def build_system_prompt() -> str:
+    return _SYSTEM_PROMPT
+
+
 def ask_llm_for_tool_or_answer(user_message: str) -> Dict[str, Any]:
     """
     Step 1: ask the LLM whether to call a tool, and which one.
@@ -186,23 +661,110 @@ def ask_llm_for_tool_or_answer(user_message: str) -> Dict[str, Any]:
     or
       { "tool": "<name>", "args": { ... } }
     """
-    system_prompt = build_system_prompt()
+    global _decision_schema_ok
+
     messages = [
-        {"role": "system", "content": system_prompt},
+        _DECIDE_SYSTEM_MESSAGE,
         {"role": "user", "content": user_message},
     ]
 
-    text = _hf_chat(messages, max_tokens=512).strip()
+    text = None
+    if _decision_schema_ok:
+        try:
+            text = _hf_chat(
+                messages, max_tokens=512, response_format=_DECISION_RESPONSE_FORMAT
+            ).strip()
+        except Exception:
+            _decision_schema_ok = False
+    if text is None:
+        text = _hf_chat(messages, max_tokens=512).strip()
 
     try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        # Fallback: wrap whatever the model said as a direct answer
+        data = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        # Unreachable when the provider enforces the schema; kept as a
+        # guard for providers that silently ignore response_format.
         data = {"answer": text}
 
     return data
 
 
+def _ask_llm_for_tool_or_answer_speculative(user_message: str):
+    """
+    Step 1 with speculative dispatch: stream the decision and, as soon as
+    the accumulated text parses as a complete single-tool call, fire the
+    tool request on the pool while the model finishes its trailing tokens
+    (closing braces, whitespace, stream shutdown). Overlapping that tail
+    with the tool's network round-trip shaves its latency off the turn.
+
+    Returns (decision, speculated, future): `speculated` is the
+    (tool_name, validated_args) pair the in-flight `future` was launched
+    for, or None (with future None) when nothing was dispatched. Callers
+    must only consume the future when their own parse of the decision
+    matches `speculated`; a mismatched future is simply abandoned (its
+    result still lands in the tool memo, so nothing is wasted).
+    """
+    global _decision_schema_ok
+
+    messages = [
+        _DECIDE_SYSTEM_MESSAGE,
+        {"role": "user", "content": user_message},
+    ]
+
+    drained = None
+    if _decision_schema_ok:
+        try:
+            drained = _drain_decision_stream(messages, _DECISION_RESPONSE_FORMAT)
+        except Exception:
+            # A speculative future fired before the stream died is simply
+            # abandoned, like any mismatched one; its result still lands
+            # in the tool memo.
+            _decision_schema_ok = False
+    if drained is None:
+        drained = _drain_decision_stream(messages, None)
+    text, speculated, future = drained
+
+    try:
+        decision = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        decision = {"answer": text}
+
+    return decision, speculated, future
+
+
+def _drain_decision_stream(
+    messages: List[Dict[str, str]],
+    response_format: Optional[Dict[str, Any]],
+) -> Tuple[str, Optional[Tuple[str, Dict[str, Any]]], Any]:
+    """Consume one decision stream, dispatching the tool speculatively."""
+    chunks: List[str] = []
+    speculated: Optional[Tuple[str, Dict[str, Any]]] = None
+    future = None
+
+    for delta in _hf_chat_stream(
+        messages, max_tokens=512, response_format=response_format
+    ):
+        chunks.append(delta)
+        # Only bother re-parsing when an object may just have closed.
+        if future is not None or "}" not in delta:
+            continue
+        try:
+            candidate = orjson.loads("".join(chunks).strip())
+        except orjson.JSONDecodeError:
+            continue
+        tool_name = candidate.get("tool") if isinstance(candidate, dict) else None
+        if tool_name in _TOOL_REGISTRY and isinstance(candidate.get("args"), dict):
+            row = _TOOL_REGISTRY[tool_name]
+            try:
+                args = _validate_tool_args(row, tool_name, candidate["args"])
+            except ValueError:
+                continue
+            future = _TOOL_EXECUTOR.submit(_call_tool_cached, row.fn, tool_name, args)
+            speculated = (tool_name, args)
+
+    return "".join(chunks).strip(), speculated, future
+
+
 def ask_llm_to_explain_result(
     user_message: str,
     tool_name: str,
@@ -212,60 +774,250 @@ def ask_llm_to_explain_result(
     """
     Step 3: after calling the tool, ask the LLM to explain the result.
     """
-    tool_desc = _tool_schema().get(tool_name, {})
-    prompt = (
-        "You are a geospatial assistant. A tool has been called on behalf of the user.\n\n"
+    messages = [
+        _EXPLAIN_SYSTEM_MESSAGE,
+        {"role": "user", "content": _explain_user_blob(user_message, tool_name, args, result)},
+    ]
+
+    return _hf_chat(messages, max_tokens=512).strip()
+
+
+def _explain_user_blob(
+    user_message: str,
+    tool_name: str,
+    args: Dict[str, Any],
+    result: Any,
+) -> str:
+    """Volatile per-turn part of the explain prompt; the raw result goes last."""
+    # Route geometry is useless to the LLM and can run to kilobytes of
+    # input tokens, so it never reaches the prompt.
+    if isinstance(result, dict) and "geometry" in result:
+        result = {k: v for k, v in result.items() if k != "geometry"}
+    return (
         f"User message:\n{user_message}\n\n"
         f"Tool used: {tool_name}\n"
-        f"Tool description: {tool_desc.get('description', '')}\n"
-        f"Arguments: {json.dumps(args, indent=2)}\n\n"
-        f"Raw tool result (JSON):\n{json.dumps(result, indent=2)}\n\n"
-        "Now explain the result to the user in clear natural language. "
-        "Summarize key distances, durations, coordinates, and any useful POI details. "
-        "Do not show the raw JSON, just a human-readable explanation."
+        f"Arguments: {_json_dumps(args)}\n\n"
+        f"Raw tool result (JSON):\n{_json_dumps(result)}"
     )
 
-    messages = [
-        {"role": "system", "content": "You are a helpful geospatial assistant."},
-        {"role": "user", "content": prompt},
-    ]
 
-    return _hf_chat(messages, max_tokens=512).strip()
+def ask_llm_to_explain_results(
+    user_message: str,
+    calls: List[Tuple[str, Dict[str, Any], Any]],
+) -> str:
+    """
+    Step 3 (multi-tool variant): explain the results of several tools.
+
+    Fixed-shape results are rendered by the deterministic formatters; the
+    rest get one explanation each, concurrently via _hf_chat_many. The
+    sections are joined into a single answer in call order.
+    """
+    sections: List[Optional[str]] = []
+    messages_list = []
+    pending_indices: List[int] = []
+    for i, (tool_name, args, result) in enumerate(calls):
+        formatted = _format_tool_result(_TOOL_REGISTRY[tool_name], args, result)
+        sections.append(formatted)
+        if formatted is not None:
+            continue
+        pending_indices.append(i)
+        messages_list.append(
+            [
+                _EXPLAIN_SYSTEM_MESSAGE,
+                {"role": "user", "content": _explain_user_blob(user_message, tool_name, args, result)},
+            ]
+        )
+
+    if messages_list:
+        explanations = _hf_chat_many(messages_list, max_tokens=512)
+        for i, text in zip(pending_indices, explanations):
+            sections[i] = text.strip()
+
+    return "\n\n".join(text for text in sections if text)
 
 
 def handle_user_message(user_message: str) -> str:
     """
     Full agent flow for one user message:
-    1. Ask LLM whether to use a tool or answer directly.
-    2. If tool: run the Python function, then ask LLM to explain result.
+    1. Check the answer cache for an exact repeat of the prompt.
+    2. Ask LLM whether to use a tool or answer directly.
+    3. If tool: run the Python function (memoized), then ask LLM to explain result.
     """
-    decision = ask_llm_for_tool_or_answer(user_message)
+    norm = _normalize_prompt(user_message)
+    cached = _answer_cache_get(norm)
+    if cached is not None:
+        return cached
+
+    decision, speculated, spec_future = _ask_llm_for_tool_or_answer_speculative(user_message)
 
     # Direct answer path
     if "answer" in decision and "tool" not in decision:
-        return decision["answer"]
+        answer = decision["answer"]
+        _answer_cache_put(norm, answer)
+        return answer
+
+    # Tool path: either a single {"tool", "args"} or {"tools": [...]} fan-out.
+    if isinstance(decision.get("tools"), list):
+        requested = decision["tools"]
+    else:
+        requested = [decision]
+
+    tool_calls: List[Tuple[str, Dict[str, Any]]] = []
+    for call in requested:
+        tool_name = call.get("tool") if isinstance(call, dict) else None
+        if tool_name not in _TOOL_REGISTRY:
+            return f"I tried to call an unknown tool '{tool_name}'. Please refine your request."
+        try:
+            args = _validate_tool_args(_TOOL_REGISTRY[tool_name], tool_name, call.get("args", {}) or {})
+        except ValueError as e:
+            return f"Invalid arguments for tool '{tool_name}': {e}"
+        tool_calls.append((tool_name, args))
+
+    if len(tool_calls) == 1:
+        tool_name, args = tool_calls[0]
+        try:
+            if spec_future is not None and speculated == (tool_name, args):
+                result = spec_future.result()
+            else:
+                result = _call_tool_cached(_TOOL_REGISTRY[tool_name].fn, tool_name, args)
+        except TypeError as e:
+            return f"There was an error calling tool '{tool_name}' with arguments {args}: {e}"
+        except Exception as e:
+            return f"Tool '{tool_name}' failed with an exception: {e}"
+
+        answer = _format_tool_result(_TOOL_REGISTRY[tool_name], args, result)
+        if answer is None:
+            answer = ask_llm_to_explain_result(user_message, tool_name, args, result)
+        _answer_cache_put(norm, answer)
+        return answer
+
+    # Several independent tools: run them concurrently and explain together.
+    futures = [
+        _TOOL_EXECUTOR.submit(_call_tool_cached, _TOOL_REGISTRY[name].fn, name, args)
+        for name, args in tool_calls
+    ]
+
+    calls_with_results: List[Tuple[str, Dict[str, Any], Any]] = []
+    any_failed = False
+    for (tool_name, args), future in zip(tool_calls, futures):
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {"error": f"Tool '{tool_name}' failed: {e}"}
+            any_failed = True
+        calls_with_results.append((tool_name, args, result))
+
+    answer = ask_llm_to_explain_results(user_message, calls_with_results)
+    # Like the single-tool path, a turn with a failed tool is never
+    # cached: the answer cache has no TTL, and a transient gateway error
+    # must not keep answering this prompt after the service recovers.
+    if not any_failed:
+        _answer_cache_put(norm, answer)
+    return answer
+
+
+def handle_user_message_stream(user_message: str):
+    """
+    Streaming variant of handle_user_message for the web UI: yields the
+    accumulated answer text as it grows.
+
+    The tool decision still needs the complete JSON before anything can
+    run, so only the final explanation is streamed; cached answers,
+    deterministic formatter output, and multi-tool turns arrive in one
+    piece.
+    """
+    norm = _normalize_prompt(user_message)
+    cached = _answer_cache_get(norm)
+    if cached is not None:
+        yield cached
+        return
+
+    decision, speculated, spec_future = _ask_llm_for_tool_or_answer_speculative(user_message)
+
+    if "answer" in decision and "tool" not in decision:
+        answer = decision["answer"]
+        _answer_cache_put(norm, answer)
+        yield answer
+        return
+
+    if isinstance(decision.get("tools"), list):
+        requested = decision["tools"]
+    else:
+        requested = [decision]
 
-    # Tool path
-    tool_name = decision.get("tool")
-    args = decision.get("args", {}) or {}
+    tool_calls: List[Tuple[str, Dict[str, Any]]] = []
+    for call in requested:
+        tool_name = call.get("tool") if isinstance(call, dict) else None
+        if tool_name not in _TOOL_REGISTRY:
+            yield f"I tried to call an unknown tool '{tool_name}'. Please refine your request."
+            return
+        try:
+            args = _validate_tool_args(_TOOL_REGISTRY[tool_name], tool_name, call.get("args", {}) or {})
+        except ValueError as e:
+            yield f"Invalid arguments for tool '{tool_name}': {e}"
+            return
+        tool_calls.append((tool_name, args))
 
-    if tool_name not in TOOL_FUNCTIONS:
-        return f"I tried to call an unknown tool '{tool_name}'. Please refine your request."
+    if len(tool_calls) > 1:
+        # Multi-tool turns already overlap their explain calls internally.
+        futures = [
+            _TOOL_EXECUTOR.submit(_call_tool_cached, _TOOL_REGISTRY[name].fn, name, args)
+            for name, args in tool_calls
+        ]
+        calls_with_results: List[Tuple[str, Dict[str, Any], Any]] = []
+        any_failed = False
+        for (tool_name, args), future in zip(tool_calls, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"error": f"Tool '{tool_name}' failed: {e}"}
+                any_failed = True
+            calls_with_results.append((tool_name, args, result))
 
-    tool_fn = TOOL_FUNCTIONS[tool_name]
+        answer = ask_llm_to_explain_results(user_message, calls_with_results)
+        # A turn with a failed tool is never cached; see handle_user_message.
+        if not any_failed:
+            _answer_cache_put(norm, answer)
+        yield answer
+        return
 
+    tool_name, args = tool_calls[0]
     try:
-        result = tool_fn(**args)
+        if spec_future is not None and speculated == (tool_name, args):
+            result = spec_future.result()
+        else:
+            result = _call_tool_cached(_TOOL_REGISTRY[tool_name].fn, tool_name, args)
     except TypeError as e:
-        return f"There was an error calling tool '{tool_name}' with arguments {args}: {e}"
+        yield f"There was an error calling tool '{tool_name}' with arguments {args}: {e}"
+        return
     except Exception as e:
-        return f"Tool '{tool_name}' failed with an exception: {e}"
+        yield f"Tool '{tool_name}' failed with an exception: {e}"
+        return
+
+    answer = _format_tool_result(_TOOL_REGISTRY[tool_name], args, result)
+    if answer is not None:
+        _answer_cache_put(norm, answer)
+        yield answer
+        return
+
+    # Stream the explanation token-by-token.
+    messages = [
+        _EXPLAIN_SYSTEM_MESSAGE,
+        {"role": "user", "content": _explain_user_blob(user_message, tool_name, args, result)},
+    ]
+    answer = ""
+    for delta in _hf_chat_stream(messages, max_tokens=512):
+        answer += delta
+        yield answer
 
-    return ask_llm_to_explain_result(user_message, tool_name, args, result)
+    answer = answer.strip()
+    if answer:
+        _answer_cache_put(norm, answer)
+        yield answer
 
 
 # ----------------------------------------------------------------------
-# 4. Simple REPL
+# 5. Simple REPL
 # ----------------------------------------------------------------------
 
 def main() -> None:
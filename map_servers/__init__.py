@@ -2,6 +2,7 @@
 # map_servers/__init__.py
 
 from .base import ServerParams
+from .composite import poi_with_routes
 from .osm_server import (
     osm_geocode,
     osm_reverse_geocode,
@@ -15,6 +16,7 @@ from .osrm_server import (
 
 __all__ = [
     "ServerParams",
+    "poi_with_routes",
     "osm_geocode",
     "osm_reverse_geocode",
     "osm_search_poi",
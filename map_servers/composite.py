@@ -0,0 +1,109 @@
+# map_servers/composite.py
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from agents import function_tool
+
+from .osm_server import osm_search_poi_impl
+from .osrm_server import osrm_route_driving_impl
+
+logger = logging.getLogger(__name__)
+
+# Routing to each POI is independent and network-bound, so the calls fan
+# out on a small shared pool: N routes cost max(latency), not sum.
+_ROUTE_POOL = ThreadPoolExecutor(max_workers=8)
+
+
+# ------------------------
+# Pure implementation APIs
+# ------------------------
+
+def poi_with_routes_impl(
+    lat: float,
+    lon: float,
+    radius_m: int = 500,
+    key: str = "amenity",
+    value: str = "restaurant",
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    """
+    Search POIs around a coordinate and compute a driving route from that
+    coordinate to each match, in a single tool call.
+
+    One Overpass query fetches the POIs, then the OSRM route lookups run
+    concurrently instead of one agent turn per POI.
+
+    Args:
+        lat: Center latitude in decimal degrees.
+        lon: Center longitude in decimal degrees.
+        radius_m: Search radius in meters.
+        key: OSM tag key, e.g. "amenity".
+        value: OSM tag value, e.g. "restaurant".
+        limit: Max number of POIs to route to (1-20).
+
+    Returns:
+        The POI dicts from osm_search_poi_impl, each extended with either
+        a "route" dict (distance_km, duration_min, summary) or a
+        "route_error" string if routing to that POI failed.
+    """
+    limit = max(1, min(limit, 20))
+
+    pois = osm_search_poi_impl(
+        lat=lat,
+        lon=lon,
+        radius_m=radius_m,
+        key=key,
+        value=value,
+        limit=limit,
+    )
+
+    futures = [
+        _ROUTE_POOL.submit(
+            osrm_route_driving_impl,
+            start_lat=lat,
+            start_lon=lon,
+            end_lat=poi["lat"],
+            end_lon=poi["lon"],
+        )
+        for poi in pois
+    ]
+
+    results: List[Dict[str, Any]] = []
+    for poi, future in zip(pois, futures):
+        entry = dict(poi)
+        try:
+            entry["route"] = future.result()
+        except Exception as e:
+            logger.warning("Routing to POI %s failed: %s", poi.get("id"), e)
+            entry["route_error"] = str(e)
+        results.append(entry)
+
+    return results
+
+
+# ------------------------
+# Tool-wrapped APIs
+# ------------------------
+
+@function_tool
+def poi_with_routes(
+    lat: float,
+    lon: float,
+    radius_m: int = 500,
+    key: str = "amenity",
+    value: str = "restaurant",
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    """Tool wrapper for poi_with_routes_impl."""
+    return poi_with_routes_impl(
+        lat=lat,
+        lon=lon,
+        radius_m=radius_m,
+        key=key,
+        value=value,
+        limit=limit,
+    )
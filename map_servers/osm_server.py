@@ -7,6 +7,7 @@ from typing import Any, Dict, List
 
 import requests
 from agents import function_tool
+from requests.adapters import HTTPAdapter, Retry
 
 from .base import ServerParams
 
@@ -33,11 +34,24 @@ OVERPASS_PARAMS = ServerParams(
 )
 
 
-def _nominatim_headers() -> Dict[str, str]:
-    return {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/json",
-    }
+_NOMINATIM_HEADERS: Dict[str, str] = {
+    "User-Agent": USER_AGENT,
+    "Accept": "application/json",
+}
+
+# Shared keep-alive session for Nominatim and Overpass: connection reuse
+# avoids a TCP/TLS handshake per tool call, and transient gateway errors
+# are retried with a short backoff.
+_SESSION = requests.Session()
+_SESSION.headers.update(_NOMINATIM_HEADERS)
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=64,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+    ),
+)
 
 
 # ------------------------
@@ -70,14 +84,15 @@ def osm_geocode_impl(query: str, limit: int = 5) -> List[Dict[str, Any]]:
     }
 
     logger.debug("Calling Nominatim search: %s %s", url, params)
-    resp = requests.get(url, params=params, headers=_nominatim_headers(), timeout=10)
+    resp = _SESSION.get(url, params=params, timeout=10)
     resp.raise_for_status()
     data = resp.json()
 
     results: List[Dict[str, Any]] = []
+    append = results.append
     for item in data:
         try:
-            results.append(
+            append(
                 {
                     "lat": float(item["lat"]),
                     "lon": float(item["lon"]),
@@ -119,7 +134,7 @@ def osm_reverse_geocode_impl(lat: float, lon: float, zoom: int = 18) -> Dict[str
     }
 
     logger.debug("Calling Nominatim reverse: %s %s", url, params)
-    resp = requests.get(url, params=params, headers=_nominatim_headers(), timeout=10)
+    resp = _SESSION.get(url, params=params, timeout=10)
     resp.raise_for_status()
     data = resp.json()
 
@@ -174,36 +189,35 @@ def osm_search_poi_impl(
     url = OVERPASS_PARAMS.base_url + OVERPASS_PARAMS.commands["search_poi"]
     logger.debug("Calling Overpass API: %s", url)
 
-    resp = requests.post(
+    resp = _SESSION.post(
         url,
         data={"data": overpass_query},
-        headers={"User-Agent": USER_AGENT},
         timeout=30,
     )
     resp.raise_for_status()
     data = resp.json()
     elements = data.get("elements", [])[:limit]
 
+    # This loop runs per element for up to 50 records; bind the append
+    # method once and probe each dict a single time per key.
     results: List[Dict[str, Any]] = []
+    append = results.append
     for el in elements:
-        el_type = el.get("type")
-        lat_el = None
-        lon_el = None
-
-        if "lat" in el and "lon" in el:
-            lat_el = el["lat"]
-            lon_el = el["lon"]
-        elif "center" in el and isinstance(el["center"], dict):
-            lat_el = el["center"].get("lat")
-            lon_el = el["center"].get("lon")
+        lat_el = el.get("lat")
+        lon_el = el.get("lon")
+        if lat_el is None or lon_el is None:
+            center = el.get("center")
+            if isinstance(center, dict):
+                lat_el = center.get("lat")
+                lon_el = center.get("lon")
 
         if lat_el is None or lon_el is None:
             continue
 
-        results.append(
+        append(
             {
                 "id": el.get("id"),
-                "osm_type": el_type,
+                "osm_type": el.get("type"),
                 "lat": float(lat_el),
                 "lon": float(lon_el),
                 "tags": el.get("tags", {}),
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+import copy
 import logging
-from typing import Any, Dict
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 
 import requests
 from agents import function_tool
+from requests.adapters import HTTPAdapter, Retry
 
 from .base import ServerParams
 
@@ -23,11 +29,24 @@ OSRM_PARAMS = ServerParams(
 )
 
 
-def _osrm_headers() -> Dict[str, str]:
-    return {
-        "User-Agent": "map-agents-assignment/1.0 (student-project)",
-        "Accept": "application/json",
-    }
+_OSRM_HEADERS: Dict[str, str] = {
+    "User-Agent": "map-agents-assignment/1.0 (student-project)",
+    "Accept": "application/json",
+}
+
+# Shared keep-alive session: reuses TCP/TLS connections across tool calls
+# instead of paying a fresh handshake to the OSRM demo server every time,
+# and retries transient gateway errors with a short backoff.
+_SESSION = requests.Session()
+_SESSION.headers.update(_OSRM_HEADERS)
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=64,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+    ),
+)
 
 
 def _format_coords(start_lat: float, start_lon: float, end_lat: float, end_lon: float) -> str:
@@ -37,21 +56,202 @@ def _format_coords(start_lat: float, start_lon: float, end_lat: float, end_lon:
     return f"{start_lon},{start_lat};{end_lon},{end_lat}"
 
 
-def _request_route(profile: str, coords: str) -> Dict[str, Any]:
+def _request_route(profile: str, coords: str, include_geometry: bool = False) -> Dict[str, Any]:
+    # The summary path only needs distance/duration, so by default we ask
+    # OSRM to skip the overview geometry and turn-by-turn steps entirely;
+    # callers that want the shape get a compact encoded polyline instead
+    # of the much larger GeoJSON coordinate arrays.
     url = f"{OSRM_PARAMS.base_url}{OSRM_PARAMS.commands['route']}/{profile}/{coords}"
     params = {
-        "overview": "simplified",
-        "geometries": "geojson",
-        "steps": "true",
+        "overview": "simplified" if include_geometry else "false",
+        "geometries": "polyline",
+        "steps": "false",
         "alternatives": "false",
     }
     logger.debug("Calling OSRM route: %s %s", url, params)
-    resp = requests.get(url, params=params, headers=_osrm_headers(), timeout=10)
+    resp = _SESSION.get(url, params=params, timeout=10)
     resp.raise_for_status()
     data = resp.json()
     return data
 
 
+# Route and nearest-road lookups are pure functions of their coordinates,
+# and repeats (rephrased queries, UI re-submits) are common, so results
+# are cached keyed on coordinates rounded to 5 decimal places (~1 m).
+# Entries expire after an hour so traffic-dependent durations stay fresh;
+# values are deep-copied both ways so callers cannot mutate the cache.
+_RESULT_CACHE_MAX = 4096
+_RESULT_CACHE_TTL_S = 3600.0
+_result_cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+# Tool calls run on worker pools, so cache access is serialized.
+_result_cache_lock = threading.Lock()
+
+
+def _cache_get(key: Tuple) -> Optional[Dict[str, Any]]:
+    with _result_cache_lock:
+        entry = _result_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > _RESULT_CACHE_TTL_S:
+            del _result_cache[key]
+            return None
+        _result_cache.move_to_end(key)
+        return copy.deepcopy(value)
+
+
+def _cache_put(key: Tuple, value: Dict[str, Any]) -> None:
+    with _result_cache_lock:
+        _result_cache[key] = (time.monotonic(), copy.deepcopy(value))
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > _RESULT_CACHE_MAX:
+            _result_cache.popitem(last=False)
+
+
+def _route_cache_key(
+    profile: str,
+    start_lat: float,
+    start_lon: float,
+    end_lat: float,
+    end_lon: float,
+    include_geometry: bool,
+) -> Tuple:
+    return (
+        "route",
+        profile,
+        round(start_lat, 5),
+        round(start_lon, 5),
+        round(end_lat, 5),
+        round(end_lon, 5),
+        include_geometry,
+    )
+
+
+# Second, coarser cache tier exploiting plan locality: users often ask
+# for routes between the same areas with slightly jittered coordinates,
+# which the exact rounded-key cache above cannot catch. Endpoints are
+# snapped to a precision-5 geohash cell (~5 km); a stored route is only
+# reused when both requested endpoints lie within 200 m of the stored
+# ones AND the route is long enough that a 200 m endpoint shift is
+# noise. Routes shorter than _TEMPLATE_MIN_ROUTE_KM never enter the
+# tier: for a few-hundred-meter route, 200 m of jitter is a different
+# route, so those always go to the exact tier or the server.
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+_TEMPLATE_CACHE_MAX = 2048
+_TEMPLATE_CACHE_TTL_S = 1800.0
+_TEMPLATE_MATCH_RADIUS_M = 200.0
+_TEMPLATE_MIN_ROUTE_KM = 2.0
+_route_template_cache: "OrderedDict[Tuple, Tuple[float, Tuple]]" = OrderedDict()
+_route_template_cache_lock = threading.Lock()
+
+
+def _geohash(lat: float, lon: float, precision: int = 5) -> str:
+    """Standard geohash encoding of a coordinate."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    bits = []
+    even = True
+    while len(bits) < precision * 5:
+        if even:
+            mid = (lon_lo + lon_hi) / 2.0
+            if lon >= mid:
+                bits.append(1)
+                lon_lo = mid
+            else:
+                bits.append(0)
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2.0
+            if lat >= mid:
+                bits.append(1)
+                lat_lo = mid
+            else:
+                bits.append(0)
+                lat_hi = mid
+        even = not even
+
+    chars = []
+    for i in range(0, len(bits), 5):
+        idx = 0
+        for bit in bits[i:i + 5]:
+            idx = (idx << 1) | bit
+        chars.append(_GEOHASH_BASE32[idx])
+    return "".join(chars)
+
+
+def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2.0) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2.0) ** 2
+    return 6371000.0 * 2.0 * math.asin(math.sqrt(a))
+
+
+def _template_key(
+    profile: str,
+    start_lat: float,
+    start_lon: float,
+    end_lat: float,
+    end_lon: float,
+    include_geometry: bool,
+) -> Tuple:
+    return (_geohash(start_lat, start_lon), _geohash(end_lat, end_lon), profile, include_geometry)
+
+
+def _template_get(
+    profile: str,
+    start_lat: float,
+    start_lon: float,
+    end_lat: float,
+    end_lon: float,
+    include_geometry: bool,
+) -> Optional[Dict[str, Any]]:
+    key = _template_key(profile, start_lat, start_lon, end_lat, end_lon, include_geometry)
+    with _route_template_cache_lock:
+        entry = _route_template_cache.get(key)
+        if entry is None:
+            return None
+
+        stored_at, (c_start_lat, c_start_lon, c_end_lat, c_end_lon, value) = entry
+        if time.monotonic() - stored_at > _TEMPLATE_CACHE_TTL_S:
+            del _route_template_cache[key]
+            return None
+
+        if (
+            _haversine_m(start_lat, start_lon, c_start_lat, c_start_lon) > _TEMPLATE_MATCH_RADIUS_M
+            or _haversine_m(end_lat, end_lon, c_end_lat, c_end_lon) > _TEMPLATE_MATCH_RADIUS_M
+        ):
+            return None
+
+        _route_template_cache.move_to_end(key)
+        return copy.deepcopy(value)
+
+
+def _template_put(
+    profile: str,
+    start_lat: float,
+    start_lon: float,
+    end_lat: float,
+    end_lon: float,
+    include_geometry: bool,
+    value: Dict[str, Any],
+) -> None:
+    if value.get("distance_km", 0.0) < _TEMPLATE_MIN_ROUTE_KM:
+        return
+
+    key = _template_key(profile, start_lat, start_lon, end_lat, end_lon, include_geometry)
+    with _route_template_cache_lock:
+        _route_template_cache[key] = (
+            time.monotonic(),
+            (start_lat, start_lon, end_lat, end_lon, copy.deepcopy(value)),
+        )
+        _route_template_cache.move_to_end(key)
+        while len(_route_template_cache) > _TEMPLATE_CACHE_MAX:
+            _route_template_cache.popitem(last=False)
+
+
 # ------------------------
 # Pure implementation APIs
 # ------------------------
@@ -61,12 +261,26 @@ def osrm_route_driving_impl(
     start_lon: float,
     end_lat: float,
     end_lon: float,
+    include_geometry: bool = False,
 ) -> Dict[str, Any]:
     """
     Get a driving route between two coordinates using OSRM.
+
+    When include_geometry is True, the result carries the route shape as
+    an encoded polyline string (much smaller than GeoJSON); by default
+    the geometry is skipped entirely.
     """
+    key = _route_cache_key("driving", start_lat, start_lon, end_lat, end_lon, include_geometry)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    template = _template_get("driving", start_lat, start_lon, end_lat, end_lon, include_geometry)
+    if template is not None:
+        return template
+
     coords = _format_coords(start_lat, start_lon, end_lat, end_lon)
-    data = _request_route("driving", coords)
+    data = _request_route("driving", coords, include_geometry=include_geometry)
 
     if not data.get("routes"):
         raise RuntimeError(f"OSRM returned no routes: {data}")
@@ -75,12 +289,16 @@ def osrm_route_driving_impl(
     distance_km = route["distance"] / 1000.0
     duration_min = route["duration"] / 60.0
 
-    return {
+    result = {
         "distance_km": distance_km,
         "duration_min": duration_min,
         "summary": route.get("summary", ""),
-        "geometry": route.get("geometry"),  # GeoJSON LineString
     }
+    if include_geometry:
+        result["geometry"] = route.get("geometry")  # encoded polyline
+    _cache_put(key, result)
+    _template_put("driving", start_lat, start_lon, end_lat, end_lon, include_geometry, result)
+    return result
 
 
 def osrm_route_cycling_impl(
@@ -88,14 +306,27 @@ def osrm_route_cycling_impl(
     start_lon: float,
     end_lat: float,
     end_lon: float,
+    include_geometry: bool = False,
 ) -> Dict[str, Any]:
     """
     Get a cycling route between two coordinates using OSRM.
+
+    See osrm_route_driving_impl for the include_geometry semantics.
     """
-    coords = _format_coords(start_lat, start_lon, end_lat, end_lon)
     # Depending on server profile naming, you might need "bike" or "cycling".
     profile = "bike"
-    data = _request_route(profile, coords)
+
+    key = _route_cache_key(profile, start_lat, start_lon, end_lat, end_lon, include_geometry)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    template = _template_get(profile, start_lat, start_lon, end_lat, end_lon, include_geometry)
+    if template is not None:
+        return template
+
+    coords = _format_coords(start_lat, start_lon, end_lat, end_lon)
+    data = _request_route(profile, coords, include_geometry=include_geometry)
 
     if not data.get("routes"):
         raise RuntimeError(f"OSRM returned no routes for cycling: {data}")
@@ -104,23 +335,32 @@ def osrm_route_cycling_impl(
     distance_km = route["distance"] / 1000.0
     duration_min = route["duration"] / 60.0
 
-    return {
+    result = {
         "distance_km": distance_km,
         "duration_min": duration_min,
         "summary": route.get("summary", ""),
-        "geometry": route.get("geometry"),
     }
+    if include_geometry:
+        result["geometry"] = route.get("geometry")
+    _cache_put(key, result)
+    _template_put(profile, start_lat, start_lon, end_lat, end_lon, include_geometry, result)
+    return result
 
 
 def osrm_nearest_road_impl(lat: float, lon: float, profile: str = "driving") -> Dict[str, Any]:
     """
     Snap a coordinate to the nearest road using OSRM.
     """
+    key = ("nearest", profile, round(lat, 5), round(lon, 5))
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
     url = f"{OSRM_PARAMS.base_url}{OSRM_PARAMS.commands['nearest']}/{profile}/{lon},{lat}"
     params = {"number": 1}
     logger.debug("Calling OSRM nearest: %s %s", url, params)
 
-    resp = requests.get(url, params=params, headers=_osrm_headers(), timeout=10)
+    resp = _SESSION.get(url, params=params, timeout=10)
     resp.raise_for_status()
     data = resp.json()
 
@@ -131,11 +371,13 @@ def osrm_nearest_road_impl(lat: float, lon: float, profile: str = "driving") ->
     snapped_lon, snapped_lat = wp["location"]
     distance_m = wp.get("distance")
 
-    return {
+    result = {
         "snapped_lat": float(snapped_lat),
         "snapped_lon": float(snapped_lon),
         "distance_m": float(distance_m) if distance_m is not None else None,
     }
+    _cache_put(key, result)
+    return result
 
 
 # ------------------------
@@ -148,6 +390,7 @@ def osrm_route_driving(
     start_lon: float,
     end_lat: float,
     end_lon: float,
+    include_geometry: bool = False,
 ) -> Dict[str, Any]:
     """Tool wrapper for osrm_route_driving_impl."""
     return osrm_route_driving_impl(
@@ -155,6 +398,7 @@ def osrm_route_driving(
         start_lon=start_lon,
         end_lat=end_lat,
         end_lon=end_lon,
+        include_geometry=include_geometry,
     )
 
 
@@ -164,6 +408,7 @@ def osrm_route_cycling(
     start_lon: float,
     end_lat: float,
     end_lon: float,
+    include_geometry: bool = False,
 ) -> Dict[str, Any]:
     """Tool wrapper for osrm_route_cycling_impl."""
     return osrm_route_cycling_impl(
@@ -171,6 +416,7 @@ def osrm_route_cycling(
         start_lon=start_lon,
         end_lat=end_lat,
         end_lon=end_lon,
+        include_geometry=include_geometry,
     )
 
 
@@ -0,0 +1,32 @@
+# tests/test_composite.py
+
+"""
+Very lightweight tests / demo calls for the composite map tool.
+
+As in the other test files, we call the pure implementation function
+directly rather than the tool-wrapped object from Agents SDK.
+"""
+
+from __future__ import annotations
+
+from pprint import pprint
+
+from map_servers.composite import poi_with_routes_impl
+
+
+def demo_poi_with_routes() -> None:
+    print("=== POI With Routes Demo ===")
+    # Near Brandenburg Gate, find cafes and a driving route to each
+    results = poi_with_routes_impl(
+        lat=52.5162746,
+        lon=13.3777041,
+        radius_m=500,
+        key="amenity",
+        value="cafe",
+        limit=5,
+    )
+    pprint(results)
+
+
+if __name__ == "__main__":
+    demo_poi_with_routes()
@@ -18,18 +18,21 @@ from __future__ import annotations
 
 import gradio as gr
 
-from agent_app import handle_user_message, MODEL_ID  # reuse your existing logic
+from agent_app import handle_user_message_stream, MODEL_ID  # reuse your existing logic
 
 
-def chat_fn(message: str, history: list[tuple[str, str]]) -> str:
+def chat_fn(message: str, history: list[tuple[str, str]]):
     """
-    Gradio ChatInterface callback.
+    Gradio ChatInterface callback (generator).
 
     message: latest user message
     history: list of (user, assistant) message pairs (we don't need it here)
+
+    Yielding the growing answer lets Gradio render tokens as they arrive,
+    so the user sees output after the first chunk instead of waiting for
+    the whole LLM completion.
     """
-    # Simply delegate to your agent logic
-    return handle_user_message(message)
+    yield from handle_user_message_stream(message)
 
 
 def main() -> None:
@@ -46,6 +49,7 @@ def main() -> None:
             lines=2,
         ),
         theme="soft",
+        concurrency_limit=8,
     )
 
     demo.launch()